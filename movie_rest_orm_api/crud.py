@@ -1,45 +1,94 @@
 from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, extract, between
+from datetime import date
+from functools import wraps
+from sqlalchemy import desc, between, select, insert, update, delete, bindparam
 from sqlalchemy import func
-from fastapi.logger import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 import models, schemas
 
+# in-process cache for the aggregate read endpoints : their results only
+# change on writes, which call _invalidate_stats_cache explicitly
+# capped because min_count comes from a query param : distinct values must
+# not be able to grow the cache without bound
+_stats_cache = {}
+_STATS_CACHE_MAX = 128
+
+def _cache_on_arguments(fn):
+    """ memoize an async crud function on its keyword arguments
+    (the session argument is excluded from the key) """
+    @wraps(fn)
+    async def wrapper(db, **kwargs):
+        key = (fn.__name__,) + tuple(sorted(kwargs.items()))
+        if key not in _stats_cache:
+            if len(_stats_cache) >= _STATS_CACHE_MAX:
+                # evict the oldest entry (dicts keep insertion order)
+                _stats_cache.pop(next(iter(_stats_cache)))
+            _stats_cache[key] = await fn(db, **kwargs)
+        return _stats_cache[key]
+    return wrapper
+
+def _invalidate_stats_cache():
+    _stats_cache.clear()
+
 # CRUD for Movie objects
-def get_movie(db: Session, movie_id: int):
-    # read from the database (get method read from cache)
+async def get_movie(db: AsyncSession, movie_id: int):
+    # read from the database (get checks the session identity map first,
+    # so a movie already loaded in this request costs zero queries)
     # return object read or None if not found
-    db_movie = db.query(models.Movie).filter(models.Movie.id == movie_id).first()
-    logger.error(f"Movie retrieved from DB: {db_movie.title}")
-    logger.error("director: {}".format( 
-              db_movie.director.name if db_movie.director is not None else "no director"))
-    logger.error(f"actors: {db_movie.actors}")
-    return db_movie;
+    # eager load director (single joined row) and actors (one extra IN query)
+    # so reading the relationships afterwards doesn't fire lazy loads
+    return await db.get(models.Movie, movie_id,
+                        options=(joinedload(models.Movie.director),
+                                 selectinload(models.Movie.actors)))
+
+# statements built once at import : the statement object (and thus its
+# compiled-cache entry) is reused as-is on every call, only the execution
+# parameters change
+_GET_MOVIES_STMT = select(models.Movie)     \
+        .offset(bindparam('skip')).limit(bindparam('limit'))
 
-def get_movies(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Movie).offset(skip).limit(limit).all()
+async def get_movies(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(_GET_MOVIES_STMT, {'skip': skip, 'limit': limit})
+    return result.scalars().all()
 
-def _get_movies_by_predicate(*predicate, db: Session):
+async def get_movies_stream(db: AsyncSession, batch_size: int = 1000):
+    # server-side cursor : rows arrive in batch_size chunks, so memory
+    # stays bounded however large the table is
+    result = await db.stream(
+            select(models.Movie).execution_options(yield_per=batch_size))
+    async for db_movie in result.scalars():
+        yield db_movie
+
+def _get_movies_by_predicate(*predicate):
     """ partial request to apply one or more predicate(s) to model Movie"""
-    return db.query(models.Movie)   \
-            .filter(*predicate)
-
-def get_movies_by_title(db: Session, title: str):
-    return _get_movies_by_predicate(models.Movie.title == title, db=db)    \
-            .order_by(desc(models.Movie.year))                      \
-            .all()
-            
-def get_movies_by_title_part(db: Session, title: str):
-    return _get_movies_by_predicate(models.Movie.title.like(f'%{title}%'), db=db)   \
-            .order_by(models.Movie.title, models.Movie.year)                       \
-            .all()
-
-def get_movies_by_year(db: Session, year: int):
-    return _get_movies_by_predicate(models.Movie.year == year, db=db)    \
-            .order_by(models.Movie.title)                         \
-            .all()
-
-def get_movies_by_range_year(db: Session, year_min: Optional[int], year_max: Optional[int]):
+    return select(models.Movie)   \
+            .where(*predicate)
+
+_MOVIES_BY_TITLE_STMT = _get_movies_by_predicate(models.Movie.title == bindparam('title'))  \
+        .order_by(desc(models.Movie.year))
+
+async def get_movies_by_title(db: AsyncSession, title: str):
+    result = await db.execute(_MOVIES_BY_TITLE_STMT, {'title': title})
+    return result.scalars().all()
+
+_MOVIES_BY_TITLE_PART_STMT = _get_movies_by_predicate(models.Movie.title.like(bindparam('pattern')))    \
+        .order_by(models.Movie.title, models.Movie.year)
+
+async def get_movies_by_title_part(db: AsyncSession, title: str):
+    # the pattern travels as an execution parameter so the statement shape
+    # stays constant and the compiled-statement cache is hit on every call
+    result = await db.execute(_MOVIES_BY_TITLE_PART_STMT, {'pattern': f'%{title}%'})
+    return result.scalars().all()
+
+_MOVIES_BY_YEAR_STMT = _get_movies_by_predicate(models.Movie.year == bindparam('year')) \
+        .order_by(models.Movie.title)
+
+async def get_movies_by_year(db: AsyncSession, year: int):
+    result = await db.execute(_MOVIES_BY_YEAR_STMT, {'year': year})
+    return result.scalars().all()
+
+async def get_movies_by_range_year(db: AsyncSession, year_min: Optional[int], year_max: Optional[int]):
     if year_min is None and year_max is None:
         return None
     if year_min is None:
@@ -48,199 +97,329 @@ def get_movies_by_range_year(db: Session, year_min: Optional[int], year_max: Opt
         predicate = models.Movie.year >= year_min
     else:
         predicate = between(models.Movie.year, year_min, year_max)
-    return _get_movies_by_predicate(predicate, db=db)                  \
-            .order_by(models.Movie.year, models.Movie.title)    \
-            .all()
-
-def get_movies_by_title_year(db: Session, title: str, year: int):
-    return _get_movies_by_predicate(
-                    models.Movie.title == title, 
-                    models.Movie.year == year,
-                    db=db)                                      \
-            .order_by(models.Movie.year, models.Movie.title)    \
-            .all()
-
-def get_movies_count(db: Session):
-    return db.query(models.Movie).count()
-
-def get_movies_count_year(db: Session, year: int):
-    return _get_movies_by_predicate(models.Movie.year == year).count()
-
-def get_movies_by_director_endname(db: Session, endname: str):
-    return db.query(models.Movie).join(models.Movie.director)      \
-            .filter(models.Star.name.like(f'%{endname}')) \
-            .order_by(desc(models.Movie.year))  \
-            .all()
-
-def get_movies_by_actor_endname(db: Session, endname: str):
-    return db.query(models.Movie).join(models.Movie.actors) \
-            .filter(models.Star.name.like(f'%{endname}'))   \
-            .order_by(desc(models.Movie.year))              \
-            .all()
-            
-def get_movies_count_by_year(db: Session):
-    # NB: func.count() i.e. count(*) en SQL
-    return db.query(models.Movie.year, func.count())\
-            .group_by(models.Movie.year)\
-            .order_by(models.Movie.year)\
-            .all()
-            
-def get_movies_stat_duration(db: Session):
-    return db.query(models.Movie.year,func.max(models.Movie.duration).label("max_duration"), func.min(models.Movie.duration).label("min_duration"),func.avg(models.Movie.duration).label("mean_duration")) \
-            .group_by(models.Movie.year)\
-            .order_by(models.Movie.year)\
-            .all()
-            
-def get_stats_movie_by_director(db: Session,min_count: int):
-    return db.query(models.Star, func.count(models.Movie.id))\
-        .join(models.Movie.director)\
-        .group_by(models.Star)\
-        .having(func.count(models.Movie.id) >= min_count)\
-        .order_by(func.count(models.Movie.id))\
-        .all()
-    
-def update_movie_director(db: Session, movie_id: int, director_id: int):
-    db_movie = get_movie(db=db, movie_id=movie_id)
-    db_star = get_star(db=db, star_id=director_id)
+    result = await db.execute(
+            _get_movies_by_predicate(predicate)
+            .order_by(models.Movie.year, models.Movie.title))
+    return result.scalars().all()
+
+_MOVIES_BY_TITLE_YEAR_STMT = _get_movies_by_predicate(
+                models.Movie.title == bindparam('title'),
+                models.Movie.year == bindparam('year'))     \
+        .order_by(models.Movie.year, models.Movie.title)
+
+async def get_movies_by_title_year(db: AsyncSession, title: str, year: int):
+    result = await db.execute(_MOVIES_BY_TITLE_YEAR_STMT, {'title': title, 'year': year})
+    return result.scalars().all()
+
+# direct SELECT count(id) instead of Query.count()'s subquery wrapper
+_MOVIES_COUNT_STMT = select(func.count(models.Movie.id))
+_MOVIES_COUNT_YEAR_STMT = select(func.count(models.Movie.id))   \
+        .where(models.Movie.year == bindparam('year'))
+
+@_cache_on_arguments
+async def get_movies_count(db: AsyncSession):
+    result = await db.execute(_MOVIES_COUNT_STMT)
+    return result.scalar()
+
+async def get_movies_count_year(db: AsyncSession, year: int):
+    result = await db.execute(_MOVIES_COUNT_YEAR_STMT, {'year': year})
+    return result.scalar()
+
+# name LIKE '%endname' rewritten as a prefix match on reverse(name) so the
+# btree index on reverse(name) serves it ; the pattern itself travels as an
+# execution parameter to keep the statement shape cacheable
+_star_endname_predicate = func.reverse(models.Star.name).like(bindparam('pattern'))
+
+def _endname_pattern(endname: str):
+    return {'pattern': f'{endname[::-1]}%'}
+
+_MOVIES_BY_DIRECTOR_ENDNAME_STMT = select(models.Movie).join(models.Movie.director)     \
+        .where(_star_endname_predicate)     \
+        .order_by(desc(models.Movie.year))
+
+async def get_movies_by_director_endname(db: AsyncSession, endname: str):
+    result = await db.execute(_MOVIES_BY_DIRECTOR_ENDNAME_STMT, _endname_pattern(endname))
+    return result.scalars().all()
+
+_MOVIES_BY_ACTOR_ENDNAME_STMT = select(models.Movie).join(models.Movie.actors)  \
+        .where(_star_endname_predicate)     \
+        .order_by(desc(models.Movie.year))
+
+async def get_movies_by_actor_endname(db: AsyncSession, endname: str):
+    result = await db.execute(_MOVIES_BY_ACTOR_ENDNAME_STMT, _endname_pattern(endname))
+    return result.scalars().all()
+
+# NB: func.count() i.e. count(*) en SQL
+_MOVIES_COUNT_BY_YEAR_STMT = select(models.Movie.year, func.count())    \
+        .group_by(models.Movie.year)    \
+        .order_by(models.Movie.year)
+
+@_cache_on_arguments
+async def get_movies_count_by_year(db: AsyncSession):
+    result = await db.execute(_MOVIES_COUNT_BY_YEAR_STMT)
+    return result.all()
+
+_MOVIES_STAT_DURATION_STMT = select(models.Movie.year, func.max(models.Movie.duration).label("max_duration"), func.min(models.Movie.duration).label("min_duration"), func.avg(models.Movie.duration).label("mean_duration"))   \
+        .group_by(models.Movie.year)    \
+        .order_by(models.Movie.year)
+
+async def get_movies_stat_duration(db: AsyncSession):
+    result = await db.execute(_MOVIES_STAT_DURATION_STMT)
+    return result.all()
+
+@_cache_on_arguments
+async def get_stats_movie_by_director(db: AsyncSession, min_count: int):
+    # prune before grouping : only directors already known to reach
+    # min_count enter the join, instead of aggregating every movie
+    # and discarding most groups in HAVING
+    eligible_directors = select(models.Movie.id_director)   \
+            .group_by(models.Movie.id_director)             \
+            .having(func.count() >= min_count)
+    # plain column projection : no Star instances are built, no identity
+    # map bookkeeping - the rows only feed the json response
+    result = await db.execute(
+            select(models.Star.id, models.Star.name, func.count(models.Movie.id))
+            .join(models.Movie, models.Movie.id_director == models.Star.id)
+            .where(models.Star.id.in_(eligible_directors))
+            .group_by(models.Star.id)
+            .order_by(func.count(models.Movie.id)))
+    return result.all()
+
+async def update_movie_director(db: AsyncSession, movie_id: int, director_id: int):
+    db_movie = await get_movie(db=db, movie_id=movie_id)
+    db_star = await get_star(db=db, star_id=director_id)
     if db_movie is None or db_star is None:
         return None
     db_movie.director = db_star
-    db.commit()
+    await db.commit()
+    _invalidate_stats_cache()
     return db_movie
 
-def add_movie_actor(db: Session, movie_id: int, star_id: int):
-    db_movie = get_movie(db=db, movie_id=movie_id)
-    db_star = get_star(db=db, star_id=star_id)
+async def add_movie_actor(db: AsyncSession, movie_id: int, star_id: int):
+    db_movie = await get_movie(db=db, movie_id=movie_id)
+    db_star = await get_star(db=db, star_id=star_id)
     if db_movie is None or db_star is None:
         return None
     db_movie.actors.append(db_star)
-    db.commit()
+    await db.commit()
+    _invalidate_stats_cache()
     return db_movie
 
-def update_movie_actors(db: Session, movie_id: int, star_id: List[int]):
-    stars_list = db.query(models.Star).filter(models.Star.id.in_(star_id)).all()
-    db_movie = get_movie(db=db, movie_id=movie_id)
-    if len(stars_list) != len(star_id):
+async def update_movie_actors(db: AsyncSession, movie_id: int, star_id: List[int]):
+    # load the movie with its actors collection in one go : assigning the new
+    # list below needs the current collection to diff against
+    result = await db.execute(
+            select(models.Movie)
+            .options(selectinload(models.Movie.actors))
+            .where(models.Movie.id == movie_id))
+    db_movie = result.scalar_one_or_none()
+    # single IN query for all requested stars
+    result = await db.execute(select(models.Star).where(models.Star.id.in_(star_id)))
+    stars_list = result.scalars().all()
+    # compare against the set of ids : tolerate duplicates in the request
+    if db_movie is None or len(stars_list) != len(set(star_id)):
         return None
     db_movie.actors = stars_list
-    db.commit()
+    await db.commit()
+    _invalidate_stats_cache()
     return db_movie
-    
-def create_movie(db: Session, movie: schemas.MovieCreate):
+
+async def create_movie(db: AsyncSession, movie: schemas.MovieCreate):
     # convert schema object from rest api to db model object
     db_movie = models.Movie(title=movie.title, year=movie.year, duration=movie.duration)
     # add in db cache and force insert
     db.add(db_movie)
-    db.commit()
+    await db.commit()
+    _invalidate_stats_cache()
     # retreive object from db (to read at least generated id)
-    db.refresh(db_movie)
+    await db.refresh(db_movie)
     return db_movie
 
-def update_movie(db: Session, movie: schemas.Movie):
-    db_movie = db.query(models.Movie).filter(models.Movie.id == movie.id).first()
-    if db_movie is not None:
-        # update data from db
-        db_movie.title = movie.title
-        db_movie.year = movie.year
-        db_movie.duration = movie.duration
-        # validate update in db
-        db.commit()
+async def create_movies_bulk(db: AsyncSession, movies: List[schemas.MovieCreate]):
+    # an empty parameter list would execute the INSERT once with defaults only
+    if not movies:
+        return []
+    # single multi-valued INSERT ... RETURNING instead of
+    # add + commit + refresh per object (3 round trips each)
+    result = await db.scalars(
+            insert(models.Movie).returning(models.Movie),
+            [movie.dict() for movie in movies])
+    db_movies = result.all()
+    await db.commit()
+    _invalidate_stats_cache()
+    return db_movies
+
+async def update_movie(db: AsyncSession, movie: schemas.Movie):
+    # single UPDATE ... RETURNING round trip instead of SELECT then UPDATE
+    result = await db.execute(
+            update(models.Movie)
+            .where(models.Movie.id == movie.id)
+            .values(title=movie.title, year=movie.year, duration=movie.duration)
+            .returning(models.Movie))
+    db_movie = result.scalar_one_or_none()
+    await db.commit()
+    _invalidate_stats_cache()
     # return updated object or None if not found
     return db_movie
 
-def delete_movie(db: Session, movie_id: int):
-     db_movie = db.query(models.Movie).filter(models.Movie.id == movie_id).first()
-     if db_movie is not None:
-         # delete object from ORM
-         db.delete(db_movie)
-         # validate delete in db
-         db.commit()
-     # return deleted object or None if not found
-     return db_movie
- 
-    
+async def delete_movie(db: AsyncSession, movie_id: int):
+    # clear play associations first (the fk has no ON DELETE CASCADE ;
+    # the ORM unit of work used to do this by loading the collection)
+    await db.execute(
+            delete(models.play_association_table)
+            .where(models.play_association_table.c.id_movie == movie_id))
+    # single DELETE ... RETURNING round trip instead of SELECT then DELETE
+    result = await db.execute(
+            delete(models.Movie)
+            .where(models.Movie.id == movie_id)
+            .returning(models.Movie))
+    db_movie = result.scalar_one_or_none()
+    await db.commit()
+    _invalidate_stats_cache()
+    # return deleted object or None if not found
+    return db_movie
+
+
 # CRUD for Star objects
-def _get_stars_by_predicate(*predicate, db: Session):
+def _get_stars_by_predicate(*predicate):
     """ partial request to apply one or more predicate(s) to model Star"""
-    return db.query(models.Star)   \
-            .filter(*predicate)    
+    return select(models.Star)   \
+            .where(*predicate)
 
-def get_star(db: Session, star_id: int):
-    # read from the database (get method read from cache)
+async def get_star(db: AsyncSession, star_id: int):
+    # read from the database (get checks the session identity map first)
     # return object read or None if not found
-    return db.query(models.Star).filter(models.Star.id == star_id).first()
-    #return db.query(models.Star).get(1)
-    #return schemas.Star(id=1, name="Fred")
-
-def get_stars(db: Session, skip: int = 0):
-    return db.query(models.Star).filter(models.Star.birthdate.isnot(None)).offset(skip).all()
-
-def get_stars_by_name(db: Session, name: str):
-    return _get_stars_by_predicate(models.Star.name == name, db=db) \
-            .order_by(models.Star.birthdate)  \
-            .all()
-
-def get_stars_by_endname(db: Session, name: str):
-    return _get_stars_by_predicate(models.Star.name.like(f'%{name}'), db=db) \
-            .order_by(models.Star.birthdate)  \
-            .all()
-
-def get_stars_by_birthyear(db: Session, year: int):
-    return _get_stars_by_predicate(extract('year', models.Star.birthdate) == year, db=db) \
-            .order_by(models.Star.name)  \
-            .all()
-
-def get_stars_count(db: Session):
-    return db.query(models.Star).count()
-
-def get_star_director_movie(db: Session, movie_id: int):
-    db_movie = db.query(models.Movie).filter(models.Movie.id == movie_id)  \
-        .join(models.Movie.director).first()
-    if db_movie is not None:
-        return db_movie.director
-    else:
-        return None
-    
-def get_star_director_movie_by_title(db: Session, title: str):
-    db_movies = db.query(models.Movie).filter(models.Movie.title.like(f'%{title}%')) \
-        .join(models.Movie.director)  
-    return [ db_movie.director for db_movie in db_movies ]
-
-def get_stats_by_stars(db: Session,min_count: int):
-    return db.query(models.Star, func.count(models.Movie.id), func.min(models.Movie.year), func.max(models.Movie.year))\
-        .join(models.Movie.actors)\
-        .group_by(models.Star)\
-        .having(func.count(models.Movie.id) >= min_count)\
-        .order_by(desc(func.count(models.Movie.id)))\
-        .all()
-
-def create_star(db: Session, star: schemas.StarCreate):
+    return await db.get(models.Star, star_id)
+
+_GET_STARS_STMT = select(models.Star)   \
+        .where(models.Star.birthdate.isnot(None))   \
+        .offset(bindparam('skip'))
+
+async def get_stars(db: AsyncSession, skip: int = 0):
+    result = await db.execute(_GET_STARS_STMT, {'skip': skip})
+    return result.scalars().all()
+
+async def get_stars_stream(db: AsyncSession, batch_size: int = 1000):
+    # server-side cursor, see get_movies_stream
+    result = await db.stream(
+            select(models.Star)
+            .where(models.Star.birthdate.isnot(None))
+            .execution_options(yield_per=batch_size))
+    async for db_star in result.scalars():
+        yield db_star
+
+_STARS_BY_NAME_STMT = _get_stars_by_predicate(models.Star.name == bindparam('name'))    \
+        .order_by(models.Star.birthdate)
+
+async def get_stars_by_name(db: AsyncSession, name: str):
+    result = await db.execute(_STARS_BY_NAME_STMT, {'name': name})
+    return result.scalars().all()
+
+_STARS_BY_ENDNAME_STMT = _get_stars_by_predicate(_star_endname_predicate)   \
+        .order_by(models.Star.birthdate)
+
+async def get_stars_by_endname(db: AsyncSession, name: str):
+    result = await db.execute(_STARS_BY_ENDNAME_STMT, _endname_pattern(name))
+    return result.scalars().all()
+
+# range predicate on birthdate instead of extract('year', ...) :
+# same rows, but the btree on birthdate can serve it
+_STARS_BY_BIRTHYEAR_STMT = _get_stars_by_predicate(
+                models.Star.birthdate.between(bindparam('day_min'), bindparam('day_max')))  \
+        .order_by(models.Star.name)
+
+async def get_stars_by_birthyear(db: AsyncSession, year: int):
+    result = await db.execute(
+            _STARS_BY_BIRTHYEAR_STMT,
+            {'day_min': date(year, 1, 1), 'day_max': date(year, 12, 31)})
+    return result.scalars().all()
+
+_STARS_COUNT_STMT = select(func.count(models.Star.id))
+
+async def get_stars_count(db: AsyncSession):
+    result = await db.execute(_STARS_COUNT_STMT)
+    return result.scalar()
+
+_STAR_DIRECTOR_MOVIE_STMT = select(models.Star)     \
+        .join(models.Movie, models.Movie.id_director == models.Star.id)     \
+        .where(models.Movie.id == bindparam('movie_id'))
+
+async def get_star_director_movie(db: AsyncSession, movie_id: int):
+    result = await db.execute(_STAR_DIRECTOR_MOVIE_STMT, {'movie_id': movie_id})
+    return result.scalar_one_or_none()
+
+# select the directors directly instead of iterating movies and
+# reading .director per row : one JOIN query for the whole result
+_STAR_DIRECTOR_MOVIE_BY_TITLE_STMT = select(models.Star)    \
+        .join(models.Movie, models.Movie.id_director == models.Star.id)     \
+        .where(models.Movie.title.like(bindparam('pattern')))   \
+        .distinct()
+
+async def get_star_director_movie_by_title(db: AsyncSession, title: str):
+    result = await db.execute(_STAR_DIRECTOR_MOVIE_BY_TITLE_STMT, {'pattern': f'%{title}%'})
+    return result.scalars().all()
+
+@_cache_on_arguments
+async def get_stats_by_stars(db: AsyncSession, min_count: int):
+    # same pruning as get_stats_movie_by_director, on the play
+    # association table : actors below min_count never enter the join
+    eligible_actors = select(models.play_association_table.c.id_actor)     \
+            .group_by(models.play_association_table.c.id_actor)           \
+            .having(func.count() >= min_count)
+    # plain column projection, see get_stats_movie_by_director
+    result = await db.execute(
+            select(models.Star.id, models.Star.name, func.count(models.Movie.id), func.min(models.Movie.year), func.max(models.Movie.year))
+            .select_from(models.Movie).join(models.Movie.actors)
+            .where(models.Star.id.in_(eligible_actors))
+            .group_by(models.Star.id)
+            .order_by(desc(func.count(models.Movie.id))))
+    return result.all()
+
+async def create_star(db: AsyncSession, star: schemas.StarCreate):
     # convert schema object from rest api to db model object
     db_star = models.Star(name=star.name, birthdate=star.birthdate)
     # add in db cache and force insert
     db.add(db_star)
-    db.commit()
+    await db.commit()
+    _invalidate_stats_cache()
     # retreive object from db (to read at least generated id)
-    db.refresh(db_star)
+    await db.refresh(db_star)
     return db_star
 
-def update_star(db: Session, star: schemas.Star):
-    db_star = db.query(models.Star).filter(models.Star.id == star.id).first()
-    if db_star is not None:
-        # update data from db
-        db_star.name = star.name
-        db_star.birthdate = star.birthdate
-        # validate update in db
-        db.commit()
+async def create_stars_bulk(db: AsyncSession, stars: List[schemas.StarCreate]):
+    # an empty parameter list would execute the INSERT once with defaults only
+    if not stars:
+        return []
+    # single multi-valued INSERT ... RETURNING, see create_movies_bulk
+    result = await db.scalars(
+            insert(models.Star).returning(models.Star),
+            [star.dict() for star in stars])
+    db_stars = result.all()
+    await db.commit()
+    _invalidate_stats_cache()
+    return db_stars
+
+async def update_star(db: AsyncSession, star: schemas.Star):
+    # single UPDATE ... RETURNING round trip instead of SELECT then UPDATE
+    result = await db.execute(
+            update(models.Star)
+            .where(models.Star.id == star.id)
+            .values(name=star.name, birthdate=star.birthdate)
+            .returning(models.Star))
+    db_star = result.scalar_one_or_none()
+    await db.commit()
+    _invalidate_stats_cache()
     # return updated object or None if not found
     return db_star
 
-def delete_star(db: Session, star_id: int):
-     db_star = db.query(models.Star).filter(models.Star.id == star_id).first()
-     if db_star is not None:
-         # delete object from ORM
-         db.delete(db_star)
-         # validate delete in db
-         db.commit()
-     # return deleted object or None if not found
-     return db_star
\ No newline at end of file
+async def delete_star(db: AsyncSession, star_id: int):
+    # single DELETE ... RETURNING round trip instead of SELECT then DELETE
+    result = await db.execute(
+            delete(models.Star)
+            .where(models.Star.id == star_id)
+            .returning(models.Star))
+    db_star = result.scalar_one_or_none()
+    await db.commit()
+    _invalidate_stats_cache()
+    # return deleted object or None if not found
+    return db_star
@@ -3,13 +3,12 @@ import logging
 
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.logger import logger as fastapi_logger
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import crud, models, schemas
 from database import SessionLocal, engine
 
-models.Base.metadata.create_all(bind=engine)
-
 
 app = FastAPI()
 
@@ -19,189 +18,233 @@ fastapi_logger.setLevel(logger.level)
 logger.error("API Started")
 
 
+@app.on_event("startup")
+async def create_tables():
+    # DDL is sync-only : run it through the async engine bridge
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+
 # Dependency
-def get_db():
+async def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        # drop the task-scoped session at request teardown
+        await SessionLocal.remove()
 
 
 @app.get("/movies/", response_model=List[schemas.Movie])
-def read_movies(skip: Optional[int] = 0, limit: Optional[int] = 100, db: Session = Depends(get_db)):
+async def read_movies(skip: Optional[int] = 0, limit: Optional[int] = 100, db: AsyncSession = Depends(get_db)):
     # read items from database
-    movies = crud.get_movies(db, skip=skip, limit=limit)
+    movies = await crud.get_movies(db, skip=skip, limit=limit)
     # return them as json
     return movies
 
+async def _json_array_stream(items, schema):
+    # build the json array row by row while the cursor streams
+    yield '['
+    first = True
+    async for item in items:
+        if not first:
+            yield ','
+        first = False
+        yield schema.from_orm(item).json()
+    yield ']'
+
+@app.get("/movies/stream")
+async def read_movies_stream(db: AsyncSession = Depends(get_db)):
+    # whole table, streamed through a server-side cursor :
+    # bounded memory on both the ORM and the response side
+    return StreamingResponse(
+            _json_array_stream(crud.get_movies_stream(db), schemas.Movie),
+            media_type="application/json")
+
 @app.get("/movies/by_id/{movie_id}", response_model=schemas.MovieDetail)
-def read_movie(movie_id: int, db: Session = Depends(get_db)):
-    db_movie = crud.get_movie(db, movie_id=movie_id)
+async def read_movie(movie_id: int, db: AsyncSession = Depends(get_db)):
+    db_movie = await crud.get_movie(db, movie_id=movie_id)
     if db_movie is None:
         raise HTTPException(status_code=404, detail="Movie to read not found")
     return db_movie
 
 @app.get("/movies/by_title", response_model=List[schemas.Movie])
-def read_movies_by_title(t: str, db: Session = Depends(get_db)):
-    return crud.get_movies_by_title(db=db, title=t)
-            
+async def read_movies_by_title(t: str, db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_by_title(db=db, title=t)
+
 @app.get("/movies/by_title_part", response_model=List[schemas.Movie])
-def read_movies_by_title_part(t: str, db: Session = Depends(get_db)):
-    return crud.get_movies_by_title_part(db=db, title=t)
+async def read_movies_by_title_part(t: str, db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_by_title_part(db=db, title=t)
     # Exeemple de Fake returns
     # return [schemas.Movie(title='Mulan', year=1998, id=1)]
     # return [{'title':'Mulan','year':1998, 'id':1}]
 
 @app.get("/movies/by_year/{year}", response_model=List[schemas.Movie])
-def read_movies_by_year(year: int, db: Session = Depends(get_db)):
-    return crud.get_movies_by_year(db=db, year=year)
+async def read_movies_by_year(year: int, db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_by_year(db=db, year=year)
 
 @app.get("/movies/by_range_year", response_model=List[schemas.Movie])
-def read_movies_by_range_year(ymin: Optional[int], ymax: Optional[int], db: Session = Depends(get_db)):
-    return crud.get_movies_by_range_year(db=db, year_min=ymin, year_max=ymax)
+async def read_movies_by_range_year(ymin: Optional[int], ymax: Optional[int], db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_by_range_year(db=db, year_min=ymin, year_max=ymax)
 
 @app.get("/movies/by_title_year", response_model=List[schemas.Movie])
-def read_movies_by_title_year(t: str, y: int, db: Session = Depends(get_db)):
-    return crud.get_movies_by_title_year(db=db, title=t, year=y)
+async def read_movies_by_title_year(t: str, y: int, db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_by_title_year(db=db, title=t, year=y)
 
 @app.get("/movies/count")
-def read_movies_count(db: Session = Depends(get_db)):
-    return crud.get_movies_count(db=db)
+async def read_movies_count(db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_count(db=db)
 
 @app.get("/movies/count/{year}")
-def read_movies_count_year(year:int, db: Session = Depends(get_db)):
-    return crud.get_movies_count_year(db=db, year=year)
+async def read_movies_count_year(year:int, db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_count_year(db=db, year=year)
 
 @app.get("/movies/by_director", response_model=List[schemas.Movie])
-def read_movies_by_director(n: str, db: Session = Depends(get_db)):
-    return crud.get_movies_by_director_endname(db=db, endname=n)
+async def read_movies_by_director(n: str, db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_by_director_endname(db=db, endname=n)
 
 @app.get("/movies/by_actor", response_model=List[schemas.Movie])
-def read_movies_by_actor(n: str, db: Session = Depends(get_db)):
-    return crud.get_movies_by_actor_endname(db=db, endname=n)
+async def read_movies_by_actor(n: str, db: AsyncSession = Depends(get_db)):
+    return await crud.get_movies_by_actor_endname(db=db, endname=n)
 
 @app.get("/movies/count_by_year")
-def read_movies_count_by_year(db: Session = Depends(get_db)) -> List[Tuple[int, int]]:
-    return crud.get_movies_count_by_year(db=db)
+async def read_movies_count_by_year(db: AsyncSession = Depends(get_db)) -> List[Tuple[int, int]]:
+    return await crud.get_movies_count_by_year(db=db)
 
 @app.get("/movies/stats_duration")
-def read_movies_stat_duration(db: Session = Depends(get_db)):
-    return crud.get_movies_stat_duration(db=db)
+async def read_movies_stat_duration(db: AsyncSession = Depends(get_db)) -> List[Tuple[int, int, int, float]]:
+    return await crud.get_movies_stat_duration(db=db)
 
 @app.get("/stars/stats_movie_by_director")
-def read_stats_movie_by_director(minc: Optional[int]=10, db: Session = Depends(get_db)):
-    return crud.get_stats_movie_by_director(db=db, min_count=minc)
+async def read_stats_movie_by_director(minc: Optional[int]=10, db: AsyncSession = Depends(get_db)) -> List[Tuple[int, str, int]]:
+    return await crud.get_stats_movie_by_director(db=db, min_count=minc)
 
 @app.post("/movies/", response_model=schemas.Movie)
-def create_movie(movie: schemas.MovieCreate, db: Session = Depends(get_db)):
+async def create_movie(movie: schemas.MovieCreate, db: AsyncSession = Depends(get_db)):
     # receive json movie without id and return json movie from database with new id
-    return crud.create_movie(db=db, movie=movie)
+    return await crud.create_movie(db=db, movie=movie)
+
+@app.post("/movies/bulk", response_model=List[schemas.Movie])
+async def create_movies_bulk(movies: List[schemas.MovieCreate], db: AsyncSession = Depends(get_db)):
+    # receive a json array of movies without id, insert them in one statement
+    return await crud.create_movies_bulk(db=db, movies=movies)
 
 @app.put('/movies/director', response_model=schemas.MovieDetail)
-def update_movie_director(mid: int, sid: int, db: Session = Depends(get_db)):
-    db_movie = crud.update_movie_director(db=db, movie_id=mid, director_id=sid) 
+async def update_movie_director(mid: int, sid: int, db: AsyncSession = Depends(get_db)):
+    db_movie = await crud.update_movie_director(db=db, movie_id=mid, director_id=sid)
     if db_movie is None:
         raise HTTPException(status_code=404, detail="Movie or Star not found")
     return db_movie
-    
+
 @app.post("/movies/actor", response_model=schemas.Movie)
-def add_movie_actor(mid: int, sid: int , db: Session = Depends(get_db)):
-    db_movie = crud.add_movie_actor(db=db, movie_id=mid, star_id=sid)
+async def add_movie_actor(mid: int, sid: int , db: AsyncSession = Depends(get_db)):
+    db_movie = await crud.add_movie_actor(db=db, movie_id=mid, star_id=sid)
     if db_movie is None:
         raise HTTPException(status_code=404, detail="Movie or Star not found")
     return db_movie
 
 
 @app.put("/movies/actors")
-def update_movie_actors(mid: int, sid: List[int], db: Session = Depends(get_db)):
-    db_movie = crud.update_movie_actors(db=db, movie_id=mid, star_id=sid)
+async def update_movie_actors(mid: int, sid: List[int], db: AsyncSession = Depends(get_db)):
+    db_movie = await crud.update_movie_actors(db=db, movie_id=mid, star_id=sid)
     if db_movie is None:
         raise HTTPException(status_code=404, detail="Movie or Star not found")
     return db_movie
 
-    
+
 @app.put("/movies/", response_model=schemas.Movie)
-def update_movie(movie: schemas.Movie, db: Session = Depends(get_db)):
-    db_movie = crud.update_movie(db, movie=movie)
+async def update_movie(movie: schemas.Movie, db: AsyncSession = Depends(get_db)):
+    db_movie = await crud.update_movie(db, movie=movie)
     if db_movie is None:
         raise HTTPException(status_code=404, detail="Movie to update not found")
     return db_movie
 
 @app.delete("/movies/{movie_id}", response_model=schemas.Movie)
-def delete_movie(movie_id: int, db: Session = Depends(get_db)):
-    db_movie = crud.delete_movie(db, movie_id=movie_id)
+async def delete_movie(movie_id: int, db: AsyncSession = Depends(get_db)):
+    db_movie = await crud.delete_movie(db, movie_id=movie_id)
     if db_movie is None:
         raise HTTPException(status_code=404, detail="Movie to delete not found")
     return db_movie
 
 # --- API Rest for Stars ---
-    
+
 @app.get("/stars", response_model=List[schemas.Star])
-def read_stars(skip: Optional[int] = 0, db: Session = Depends(get_db)):
+async def read_stars(skip: Optional[int] = 0, db: AsyncSession = Depends(get_db)):
     # read items from database
-    stars = crud.get_stars(db, skip=skip)
+    stars = await crud.get_stars(db, skip=skip)
     # return them as json
     return stars
 
+@app.get("/stars/stream")
+async def read_stars_stream(db: AsyncSession = Depends(get_db)):
+    # whole table, streamed through a server-side cursor
+    return StreamingResponse(
+            _json_array_stream(crud.get_stars_stream(db), schemas.Star),
+            media_type="application/json")
+
 @app.get("/stars/by_id/{star_id}", response_model=schemas.Star)
-def read_star(star_id: int, db: Session = Depends(get_db)):
-    db_star = crud.get_star(db, star_id=star_id)
+async def read_star(star_id: int, db: AsyncSession = Depends(get_db)):
+    db_star = await crud.get_star(db, star_id=star_id)
     if db_star is None:
         raise HTTPException(status_code=404, detail="Star to read not found")
     return db_star
 
 @app.get("/stars/by_name", response_model=List[schemas.Star])
-def read_stars_by_name(n: str, db: Session = Depends(get_db)):
+async def read_stars_by_name(n: str, db: AsyncSession = Depends(get_db)):
     # read items from database
-    stars = crud.get_stars_by_name(db=db, name=n)
+    stars = await crud.get_stars_by_name(db=db, name=n)
     return stars
 
 @app.get("/stars/by_endname", response_model=List[schemas.Star])
-def read_stars_by_endname(n: str, db: Session = Depends(get_db)):
+async def read_stars_by_endname(n: str, db: AsyncSession = Depends(get_db)):
     # read items from database
-    stars = crud.get_stars_by_endname(db=db, name=n)
+    stars = await crud.get_stars_by_endname(db=db, name=n)
     return stars
 
 @app.get("/stars/by_birthyear/{year}", response_model=List[schemas.Star])
-def read_stars_by_birthyear(year: int, db: Session = Depends(get_db)):
+async def read_stars_by_birthyear(year: int, db: AsyncSession = Depends(get_db)):
     # read items from database
-    stars = crud.get_stars_by_birthyear(db=db, year=year)
+    stars = await crud.get_stars_by_birthyear(db=db, year=year)
     return stars
 
 
 @app.get("/stars/count")
-def read_stars_count(db: Session = Depends(get_db)):
-    return crud.get_stars_count(db=db)
+async def read_stars_count(db: AsyncSession = Depends(get_db)):
+    return await crud.get_stars_count(db=db)
 
 @app.get("/stars/by_movie_directed/{movie_id}", response_model=Optional[schemas.Star])
-def read_stars_by_movie_directed_id(movie_id: int, db: Session = Depends(get_db)):
-    return crud.get_star_director_movie(db=db, movie_id=movie_id)
-    # return None if movie has no director (normal) or if movie doesn't exist (error) 
-    
+async def read_stars_by_movie_directed_id(movie_id: int, db: AsyncSession = Depends(get_db)):
+    return await crud.get_star_director_movie(db=db, movie_id=movie_id)
+    # return None if movie has no director (normal) or if movie doesn't exist (error)
+
 @app.get("/stars/by_movie_directed_title/", response_model=List[schemas.Star])
-def read_stars_by_movie_directed_title(t: str, db: Session = Depends(get_db)):
-    return crud.get_star_director_movie_by_title(db=db, title=t)
+async def read_stars_by_movie_directed_title(t: str, db: AsyncSession = Depends(get_db)):
+    return await crud.get_star_director_movie_by_title(db=db, title=t)
 
 @app.get("/stars/count_by_stars/")
-def read_stats_by_stars(minc: Optional[int]=10, db: Session = Depends(get_db)):
-    return crud.get_stats_by_stars(db=db, min_count=minc)
+async def read_stats_by_stars(minc: Optional[int]=10, db: AsyncSession = Depends(get_db)) -> List[Tuple[int, str, int, int, int]]:
+    return await crud.get_stats_by_stars(db=db, min_count=minc)
 
 @app.post("/stars/", response_model=schemas.Star)
-def create_star(star: schemas.StarCreate, db: Session = Depends(get_db)):
+async def create_star(star: schemas.StarCreate, db: AsyncSession = Depends(get_db)):
     # receive json movie without id and return json movie from database with new id
-    return crud.create_star(db=db, star=star)    
+    return await crud.create_star(db=db, star=star)
+
+@app.post("/stars/bulk", response_model=List[schemas.Star])
+async def create_stars_bulk(stars: List[schemas.StarCreate], db: AsyncSession = Depends(get_db)):
+    # receive a json array of stars without id, insert them in one statement
+    return await crud.create_stars_bulk(db=db, stars=stars)
 
 @app.put("/stars/", response_model=schemas.Star)
-def update_star(star: schemas.Star, db: Session = Depends(get_db)):
-    db_star = crud.update_star(db, star=star)
+async def update_star(star: schemas.Star, db: AsyncSession = Depends(get_db)):
+    db_star = await crud.update_star(db, star=star)
     if db_star is None:
         raise HTTPException(status_code=404, detail="Star to update not found")
     return db_star
 
 @app.delete("/stars/star_id}", response_model=schemas.Star)
-def delete_star(star_id: int, db: Session = Depends(get_db)):
-    db_star = crud.delete_star(db, star_id=star_id)
+async def delete_star(star_id: int, db: AsyncSession = Depends(get_db)):
+    db_star = await crud.delete_star(db, star_id=star_id)
     if db_star is None:
         raise HTTPException(status_code=404, detail="Star to delete not found")
-    return db_star
\ No newline at end of file
+    return db_star
@@ -2,10 +2,15 @@
 model.py : database row <-> objet python
 """
 from sqlalchemy import Table, Column, Integer, String, SmallInteger, Date, ForeignKey
+from sqlalchemy import Index, DDL, event, func
 from sqlalchemy.orm import relationship
 
 from database import Base
 
+# trigram indexing needs the pg_trgm extension
+event.listen(Base.metadata, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
 # association table play
 play_association_table = Table('play', Base.metadata,
     Column('id_movie', Integer, ForeignKey('movies.id')),
@@ -18,10 +23,10 @@ class Movie(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(length=250), nullable=False)
-    year = Column(SmallInteger, nullable=False)
+    year = Column(SmallInteger, nullable=False, index=True)
     duration = Column(SmallInteger, nullable=True)
     # Many to one relationship : director
-    id_director = Column(Integer, ForeignKey('stars.id'), nullable=True)
+    id_director = Column(Integer, ForeignKey('stars.id'), nullable=True, index=True)
     director = relationship('Star')
     # Many to many relationship : actors
     actors = relationship('Star', secondary=play_association_table)
@@ -31,4 +36,19 @@ class Star(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(length=150), nullable=False)
-    birthdate = Column(Date, nullable=True)
\ No newline at end of file
+    birthdate = Column(Date, nullable=True, index=True)
+
+
+# trigram GIN index : makes title LIKE '%...%' index-backed instead of a seq scan
+Index('movie_title_trgm', Movie.title,
+      postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+# covering index on the ORDER BY (title, year) of get_movies_by_title_part :
+# for selective patterns the planner can walk it pre-sorted and answer from
+# the index alone thanks to the INCLUDEd payload columns
+Index('movie_title_year_idx', Movie.title, Movie.year,
+      postgresql_include=['id', 'duration', 'id_director'])
+# btree on reverse(name) : serves the LIKE '%endname' queries rewritten as
+# reverse(name) LIKE 'emandne%' (index range scan) ; text_pattern_ops is
+# required for prefix LIKE to use the index on non-C collations
+Index('star_name_reverse_idx', func.reverse(Star.name).label('rev'),
+      postgresql_ops={'rev': 'text_pattern_ops'})
\ No newline at end of file